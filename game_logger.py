@@ -1,13 +1,28 @@
 """SQLite game logger for the lichess-bot.
 
 Writes game metadata, per-move engine evals, and live board state
-to a SQLite database for the spectator web UI to read.
+to a SQLite database for the spectator web UI to read. Per-move writes
+are queued and committed by a background writer thread, so the game
+loop never waits on the disk.
+
+Each game runs in its own process with its own `GameLogger`, so there is
+one writer connection per game being played. SQLite's write lock
+serializes their transactions, and `busy_timeout` makes a writer wait for
+the lock instead of failing. Readers such as the web UI should use
+`GameLogger.reader_connection()` instead of opening their own connection
+per request.
 """
 from __future__ import annotations
 
+import atexit
 import logging
+import queue
 import sqlite3
+import struct
 import datetime
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -17,6 +32,31 @@ logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent / "data" / "games.db"
 
+# Run PRAGMA optimize after this many logged moves so the query planner statistics stay fresh.
+OPTIMIZE_INTERVAL = 500
+
+# Maximum number of statements waiting for the writer thread before callers block.
+WRITE_QUEUE_SIZE = 1024
+
+# The writer thread commits at most this many already queued statements per transaction.
+WRITE_BATCH_SIZE = 64
+
+# Evals of games finished in an earlier month are moved out of the main database into one
+# archive database per month, named with the month as YYYYMM.
+ARCHIVE_NAME = "move_evals_{month}.db"
+
+# The writer thread archives the evals of this many games at a time, each time it has had no statement to write
+# for ARCHIVE_IDLE_WAIT seconds, so archiving a month never holds the write lock for long.
+ARCHIVE_CHUNK_GAMES = 20
+ARCHIVE_IDLE_WAIT = 1.0
+
+# Reader connections attach this many of the newest archives. SQLite allows 10 attached databases by default, which
+# leaves room for callers to attach two of the older ones themselves.
+MAX_READER_ARCHIVES = 8
+
+# Stored in PRAGMA user_version. Bump it when adding a migration step to `GameLogger._migrate`.
+SCHEMA_VERSION = 3
+
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS games (
     game_id TEXT PRIMARY KEY,
@@ -58,16 +98,195 @@ CREATE TABLE IF NOT EXISTS live_state (
     game_id TEXT PRIMARY KEY REFERENCES games(game_id),
     fen TEXT,
     last_move_uci TEXT,
-    moves_uci TEXT,
     wtime_ms INTEGER,
-    btime_ms INTEGER
-);
+    btime_ms INTEGER,
+    moves_bin BLOB
+) WITHOUT ROWID;
 
-CREATE INDEX IF NOT EXISTS idx_move_evals_game ON move_evals(game_id, ply);
+CREATE INDEX IF NOT EXISTS idx_move_evals_covering
+    ON move_evals(game_id, ply, move_uci, move_san, eval_cp, eval_mate, depth);
 CREATE INDEX IF NOT EXISTS idx_games_status ON games(status);
 CREATE INDEX IF NOT EXISTS idx_games_started ON games(started_at);
 """
 
+_MOVE_EVALS_COLUMNS = (
+    "id, game_id, ply, move_uci, move_san, eval_cp, eval_mate, depth, pv, nodes, nps, time_ms, source, clock_ms"
+)
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive.move_evals (
+    id INTEGER PRIMARY KEY,
+    game_id TEXT,
+    ply INTEGER,
+    move_uci TEXT,
+    move_san TEXT,
+    eval_cp INTEGER,
+    eval_mate INTEGER,
+    depth INTEGER,
+    pv TEXT,
+    nodes INTEGER,
+    nps INTEGER,
+    time_ms INTEGER,
+    source TEXT,
+    clock_ms INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS archive.idx_move_evals_covering
+    ON move_evals(game_id, ply, move_uci, move_san, eval_cp, eval_mate, depth);
+"""
+
+_SQL_INSERT_GAME = """INSERT OR REPLACE INTO games
+    (game_id, lichess_url, bot_color, opponent_name, opponent_rating,
+     opponent_is_bot, time_control, speed, mode, provenance,
+     status, result, started_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'playing', '*', ?)"""
+
+_SQL_INSERT_LIVE = """INSERT OR REPLACE INTO live_state
+    (game_id, fen, last_move_uci, moves_bin, wtime_ms, btime_ms)
+    VALUES (?, ?, NULL, X'', ?, ?)"""
+
+_SQL_INSERT_MOVE = """INSERT INTO move_evals
+    (game_id, ply, move_uci, move_san, eval_cp, eval_mate,
+     depth, pv, nodes, nps, time_ms, source, clock_ms)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+_SQL_UPDATE_LIVE = """UPDATE live_state
+    SET fen = ?, last_move_uci = ?, moves_bin = ?, wtime_ms = ?, btime_ms = ?
+    WHERE game_id = ?"""
+
+_SQL_UPDATE_FINISHED = """UPDATE games
+    SET status = 'finished', result = ?, termination = ?,
+        finished_at = ?, moves_uci = ?
+    WHERE game_id = ?"""
+
+_SQL_SELECT_LIVE_MOVES = "SELECT moves_bin FROM live_state WHERE game_id = ?"
+
+_SQL_DELETE_LIVE = "DELETE FROM live_state WHERE game_id = ?"
+
+_SQL_ARCHIVE_MONTH = """SELECT min(substr(finished_at, 1, 7)) FROM games
+    WHERE status = 'finished' AND substr(finished_at, 1, 7) < ?
+      AND EXISTS (SELECT 1 FROM move_evals WHERE move_evals.game_id = games.game_id)"""
+
+_SQL_MONTH_GAMES = """SELECT game_id FROM main.games
+    WHERE status = 'finished' AND substr(finished_at, 1, 7) = ?
+      AND EXISTS (SELECT 1 FROM main.move_evals WHERE move_evals.game_id = games.game_id)
+    ORDER BY game_id LIMIT ?"""
+
+_SQL_ARCHIVE_MOVES = f"""INSERT OR IGNORE INTO archive.move_evals ({_MOVE_EVALS_COLUMNS})
+    SELECT {_MOVE_EVALS_COLUMNS} FROM main.move_evals WHERE game_id = ?"""  # noqa: S608 (column list is a constant, not user input)
+
+# Only rows already committed to the archive are deleted
+_SQL_DELETE_ARCHIVED_MOVES = """DELETE FROM main.move_evals
+    WHERE game_id = ? AND id IN (SELECT id FROM archive.move_evals WHERE game_id = ?)"""
+
+_SQL_DELETE_LIVE_RETURNING = "DELETE FROM live_state WHERE game_id = ? RETURNING moves_bin"
+
+# DELETE ... RETURNING needs SQLite 3.35.0 or newer.
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Per-thread pool of read-only connections handed out by `GameLogger.reader_connection`.
+_readers = threading.local()
+
+_MOVE_CODE = struct.Struct("<H")
+
+# The commentary entries read by `GameLogger.move_played`, in unpacking order.
+_COMMENTARY_KEYS = ("score", "depth", "nodes", "nps", "time", "ponderpv")
+
+
+def encode_move(move: chess.Move) -> bytes:
+    """
+    Pack a move into two bytes, as stored in live_state.moves_bin.
+
+    Bits 0-5 hold the from square, bits 6-11 the to square, bits 12-14 the promotion (or dropped) piece type, and
+    bit 15 marks a drop.
+    """
+    piece = move.promotion or move.drop or 0
+    return _MOVE_CODE.pack(move.from_square | move.to_square << 6 | piece << 12 | (0x8000 if move.drop else 0))
+
+
+def decode_moves_bin(buf: bytes) -> list[chess.Move]:
+    """Unpack a moves_bin value written with `encode_move`."""
+    moves = []
+    for (code,) in _MOVE_CODE.iter_unpack(buf):
+        from_square = code & 0x3F
+        to_square = (code >> 6) & 0x3F
+        piece = (code >> 12) & 0x7 or None
+        if code & 0x8000:
+            moves.append(chess.Move(from_square, to_square, drop=piece))
+        else:
+            moves.append(chess.Move(from_square, to_square, promotion=piece))
+    return moves
+
+
+@dataclass(slots=True)
+class _GameRow:
+    """The values logged when a game starts, read from the game once."""
+
+    game_id: str
+    url: str
+    color: str
+    opponent_name: str
+    opponent_rating: int | None
+    opponent_is_bot: int
+    time_control: str
+    speed: str
+    mode: str
+    provenance: str
+    started_at: str
+    clock_ms: int
+
+    @classmethod
+    def from_game(cls, game: Any, provenance: str) -> _GameRow:
+        """Read the row values from a `model.Game`."""
+        opponent = game.opponent
+        return cls(
+            game.id,
+            game.short_url(),
+            game.my_color,
+            opponent.name,
+            opponent.rating,
+            1 if opponent.is_bot else 0,
+            game.time_control(),
+            game.speed,
+            game.mode,
+            provenance,
+            game.game_start.isoformat(),
+            int(game.clock_initial.total_seconds() * 1000),
+        )
+
+    def games_params(self) -> tuple[str | int | None, ...]:
+        """
+        Get the parameters of `_SQL_INSERT_GAME`.
+
+        The tuple is built by hand because `dataclasses.astuple` deep-copies every field.
+        """
+        return (
+            self.game_id,
+            self.url,
+            self.color,
+            self.opponent_name,
+            self.opponent_rating,
+            self.opponent_is_bot,
+            self.time_control,
+            self.speed,
+            self.mode,
+            self.provenance,
+            self.started_at,
+        )
+
+
+def _live_fen(board: chess.Board) -> str:
+    """
+    Get the FEN of `board`.
+
+    Once castling rights are gone and there is no en passant square, every field but the piece placement is a plain
+    value, so the FEN is assembled directly instead of through `Board.fen()`. Variant boards add their own fields and
+    always use `Board.fen()`.
+    """
+    if type(board) is not chess.Board or board.castling_rights or board.ep_square is not None:
+        return board.fen()
+    return f"{board.board_fen()} {'w' if board.turn else 'b'} - - {board.halfmove_clock} {board.fullmove_number}"
+
 
 class GameLogger:
     """Logs game state and engine evaluations to SQLite."""
@@ -75,105 +294,253 @@ class GameLogger:
     def __init__(self, db_path: Path = DB_PATH) -> None:
         db_path.parent.mkdir(parents=True, exist_ok=True)
         self.db_path = db_path
-        self._conn = sqlite3.connect(str(db_path), timeout=10)
+        # The connection is shared with the writer thread; `self._lock` serializes its use.
+        self._conn = sqlite3.connect(str(db_path), timeout=10, cached_statements=256, check_same_thread=False)
+        self._lock = threading.Lock()
         self._conn.execute("PRAGMA journal_mode=WAL")
         self._conn.execute("PRAGMA busy_timeout=5000")
-        self._conn.executescript(SCHEMA)
-        # Migrate: add moves_uci column to games if missing (added after initial schema)
-        try:
-            self._conn.execute("ALTER TABLE games ADD COLUMN moves_uci TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        self._conn.commit()
-        logger.info(f"GameLogger initialized: {db_path}")
+        # synchronous=NORMAL is durable under WAL and drops the fsync from every commit
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        self._conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        # Checkpoint less often during games; game_finished checkpoints at the end of each game
+        self._conn.execute("PRAGMA wal_autocheckpoint=2000")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+            self._conn.commit()
+        self._moves_since_optimize = 0
+        self._moves: dict[str, tuple[int, bytearray]] = {}  # game_id -> (ply, moves_bin)
+        self._last_live: dict[str, tuple[str, int | None, int | None]] = {}  # game_id -> (fen, wtime, btime)
+        self._archive_pending = True  # cleared by the writer thread once nothing is left to archive
+        self._queue: queue.Queue[tuple[str, tuple[Any, ...]] | None] = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._closed = False
+        self._writer = threading.Thread(target=self._drain, name="game-logger-writer", daemon=True)
+        self._writer.start()
+        logger.info("GameLogger initialized: %s", db_path)
+
+    def _migrate(self) -> None:
+        """Upgrade a database created with an older schema to `SCHEMA_VERSION`."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        if version < 1:
+            # moves_uci was added to games after the initial schema
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(games)")}
+            if "moves_uci" not in columns:
+                self._conn.execute("ALTER TABLE games ADD COLUMN moves_uci TEXT")
+        if version < 2:
+            # idx_move_evals_covering starts with (game_id, ply), so the old index on those columns is redundant
+            self._conn.execute("DROP INDEX IF EXISTS idx_move_evals_game")
+        if version < 3:
+            # v2 stored live_state WITHOUT ROWID and v3 replaced its moves_uci with moves_bin; one rebuild does both
+            (live_state_sql,) = self._conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'live_state'"
+            ).fetchone()
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(live_state)")}
+            if "WITHOUT ROWID" not in live_state_sql.upper() or "moves_uci" in columns:
+                self._rebuild_live_state()
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _rebuild_live_state(self) -> None:
+        """Copy an old live_state table into the current layout, encoding its moves_uci as moves_bin."""
+        rows = []
+        for game_id, fen, last_move, moves_uci, wtime, btime in self._conn.execute(
+            "SELECT game_id, fen, last_move_uci, moves_uci, wtime_ms, btime_ms FROM live_state"
+        ):
+            moves_bin = None
+            if moves_uci is not None:
+                moves_bin = b"".join(encode_move(chess.Move.from_uci(uci)) for uci in moves_uci.split())
+            rows.append((game_id, fen, last_move, wtime, btime, moves_bin))
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("""
+                CREATE TABLE live_state_new (
+                    game_id TEXT PRIMARY KEY REFERENCES games(game_id),
+                    fen TEXT,
+                    last_move_uci TEXT,
+                    wtime_ms INTEGER,
+                    btime_ms INTEGER,
+                    moves_bin BLOB
+                ) WITHOUT ROWID""")
+            self._conn.executemany(
+                """INSERT INTO live_state_new (game_id, fen, last_move_uci, wtime_ms, btime_ms, moves_bin)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+            self._conn.execute("DROP TABLE live_state")
+            self._conn.execute("ALTER TABLE live_state_new RENAME TO live_state")
+
+    @classmethod
+    def reader_connection(cls, db_path: Path = DB_PATH) -> sqlite3.Connection:
+        """
+        Get a read-only connection to the game database.
+
+        Connections are cached per thread, so repeated calls reuse the same file handles and page cache. The
+        connection has a temporary view, move_evals_all, that covers move_evals and the monthly archives. Each call
+        checks for archives created since the last one and rebuilds the view to include them, so callers should get
+        the connection per request instead of holding on to it.
+
+        SQLite attaches at most 10 databases to a connection, so the view covers only the newest
+        `MAX_READER_ARCHIVES` archives. Evals of older months are read by attaching their archive files directly.
+        """
+        pool: dict[Path, tuple[sqlite3.Connection, list[str]]] | None = getattr(_readers, "pool", None)
+        if pool is None:
+            pool = _readers.pool = {}
+        months = sorted(path.stem.rsplit("_", 1)[-1] for path in db_path.parent.glob(ARCHIVE_NAME.format(month="*")))
+        months = [month for month in months if month.isdigit()][-MAX_READER_ARCHIVES:]
+        entry = pool.get(db_path)
+        if entry is not None and entry[1] == months:
+            return entry[0]
+        conn, attached = entry or (
+            sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True, cached_statements=128), []
+        )
+        conn.execute("PRAGMA query_only=0")
+        conn.execute("DROP VIEW IF EXISTS temp.move_evals_all")
+        for month in set(attached).difference(months):
+            conn.execute(f"DETACH DATABASE archive_{month}")
+        selects = [f"SELECT {_MOVE_EVALS_COLUMNS} FROM main.move_evals"]  # noqa: S608 (column list is a constant, not user input)
+        for month in months:
+            if month not in attached:
+                archive = db_path.parent / ARCHIVE_NAME.format(month=month)
+                conn.execute(f"ATTACH DATABASE ? AS archive_{month}", (f"{archive.resolve().as_uri()}?mode=ro",))
+            selects.append(f"SELECT {_MOVE_EVALS_COLUMNS} FROM archive_{month}.move_evals")  # noqa: S608 (month is checked to be digits)
+        conn.execute(f"CREATE TEMP VIEW move_evals_all AS {' UNION ALL '.join(selects)}")
+        conn.execute("PRAGMA query_only=1")
+        pool[db_path] = (conn, months)
+        return conn
+
+    @property
+    def closed(self) -> bool:
+        """Whether `close` has been called."""
+        return self._closed
 
     def close(self) -> None:
+        """Write all queued statements, stop the writer thread, and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        try:
+            self._conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            logger.exception("Failed to optimize the game database")
         self._conn.close()
 
+    def _maybe_optimize(self) -> None:
+        """Run PRAGMA optimize every `OPTIMIZE_INTERVAL` logged moves."""
+        if self._closed:
+            return
+        self._moves_since_optimize += 1
+        if self._moves_since_optimize >= OPTIMIZE_INTERVAL:
+            self._moves_since_optimize = 0
+            with self._lock:
+                self._conn.execute("PRAGMA optimize")
+
+    def flush(self) -> None:
+        """Block until every queued statement has been written. Does nothing once the logger is closed."""
+        if not self._closed:
+            self._queue.join()
+
+    def _put(self, sql: str, params: tuple[Any, ...]) -> None:
+        """Queue a statement for the writer thread. Statements queued after `close` are dropped."""
+        if self._closed:
+            logger.debug("GameLogger is closed, dropping statement: %s", sql)
+            return
+        self._queue.put((sql, params))
+
+    def _drain(self) -> None:
+        """
+        Write queued statements until the `None` sentinel arrives.
+
+        Each pass takes the next statement plus up to `WRITE_BATCH_SIZE - 1` more that are already queued, without
+        waiting for new ones, and writes them in one transaction with one `executemany` per distinct statement. A
+        logger serves the one game its process plays, so a batch holds that game's backlog, such as a move_evals
+        insert and the live_state update queued right after it. Only those two statements are queued, and they may
+        be reordered relative to each other, while the rows of each statement keep their order.
+
+        Until nothing is left to archive, every `ARCHIVE_IDLE_WAIT` seconds without a statement are spent archiving
+        one chunk of old evals with `_archive_chunk`.
+        """
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=ARCHIVE_IDLE_WAIT) if self._archive_pending else self._queue.get()
+            except queue.Empty:
+                self._archive_pending = self._archive_chunk()
+                continue
+            batch: defaultdict[str, list[tuple[Any, ...]]] = defaultdict(list)
+            count = 1
+            while item is not None:
+                sql, params = item
+                batch[sql].append(params)
+                if count >= WRITE_BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                count += 1
+            stop = item is None
+
+            if batch:
+                try:
+                    with self._lock, self._conn:
+                        for sql, rows in batch.items():
+                            self._conn.executemany(sql, rows)
+                except Exception:
+                    logger.exception("Failed to write %s queued statements", count - stop)
+            for _ in range(count):
+                self._queue.task_done()
+
     def game_started(self, game: Any, provenance: str) -> None:
         """Record a new game starting."""
+        if self._closed:
+            logger.debug("GameLogger is closed, not logging game start for %s", game.id)
+            return
         try:
-            self._conn.execute(
-                """INSERT OR REPLACE INTO games
-                   (game_id, lichess_url, bot_color, opponent_name, opponent_rating,
-                    opponent_is_bot, time_control, speed, mode, provenance,
-                    status, result, started_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'playing', '*', ?)""",
-                (
-                    game.id,
-                    game.short_url(),
-                    game.my_color,
-                    game.opponent.name,
-                    game.opponent.rating,
-                    1 if game.opponent.is_bot else 0,
-                    game.time_control(),
-                    game.speed,
-                    game.mode,
-                    provenance,
-                    game.game_start.isoformat(),
-                ),
-            )
-            self._conn.execute(
-                """INSERT OR REPLACE INTO live_state
-                   (game_id, fen, last_move_uci, moves_uci, wtime_ms, btime_ms)
-                   VALUES (?, ?, NULL, '', ?, ?)""",
-                (
-                    game.id,
-                    chess.STARTING_FEN,
-                    int(game.clock_initial.total_seconds() * 1000),
-                    int(game.clock_initial.total_seconds() * 1000),
-                ),
-            )
-            self._conn.commit()
-            logger.info(f"Game started: {game.id} ({provenance})")
+            row = _GameRow.from_game(game, provenance)
+            with self._lock, self._conn:
+                self._conn.execute(_SQL_INSERT_GAME, row.games_params())
+                self._conn.execute(_SQL_INSERT_LIVE, (row.game_id, chess.STARTING_FEN, row.clock_ms, row.clock_ms))
+            self._moves[game.id] = (0, bytearray())
+            self._last_live.pop(game.id, None)
+            logger.info("Game started: %s (%s)", game.id, provenance)
         except Exception:
-            logger.exception(f"Failed to log game start for {game.id}")
+            logger.exception("Failed to log game start for %s", game.id)
 
     def move_played(
         self,
         game: Any,
-        board: chess.Board,
+        board_before: chess.Board,
         move: chess.Move,
         commentary: dict[str, Any] | None,
         source: str = "search",
     ) -> None:
-        """Record an engine move with its evaluation."""
+        """
+        Record an engine move with its evaluation. The row is written by the writer thread.
+
+        `board_before` is the position before `move` was played.
+        """
         try:
-            ply = len(board.move_stack) - 1  # board already has the move pushed
-
-            # Get SAN from the position before the move was made
-            board.pop()
-            move_san = board.san(move)
-            board.push(move)
-
-            eval_cp = None
-            eval_mate = None
-            depth = None
-            pv_str = None
-            nodes = None
-            nps = None
-            time_ms = None
-
-            if commentary:
-                score = commentary.get("score")
+            ply = len(board_before.move_stack)
+            move_san = board_before.san(move)
+
+            depth = nodes = nps = time_ms = eval_cp = eval_mate = pv_str = None
+            if commentary is not None:
+                score, depth, nodes, nps, time_val, pv_str = map(commentary.get, _COMMENTARY_KEYS)
+                pv_str = pv_str or None
+                if time_val is not None:
+                    time_ms = int(time_val * 1000) if isinstance(time_val, float) else int(time_val)
                 if score is not None:
                     # score is a PovScore from python-chess
                     white_score = score.white()
-                    if white_score.is_mate():
-                        eval_mate = white_score.mate()
-                    else:
+                    eval_mate = white_score.mate()
+                    if eval_mate is None:
                         eval_cp = white_score.score()
 
-                depth = commentary.get("depth")
-                nodes = commentary.get("nodes")
-                nps = commentary.get("nps")
-                time_val = commentary.get("time")
-                if time_val is not None:
-                    time_ms = int(time_val * 1000) if isinstance(time_val, float) else int(time_val)
-                pv_san = commentary.get("ponderpv")
-                if pv_san:
-                    pv_str = pv_san
-
             # Get bot's remaining clock
             clock_ms = None
             state = game.state
@@ -182,76 +549,131 @@ class GameLogger:
             else:
                 clock_ms = state.get("btime")
 
-            self._conn.execute(
-                """INSERT INTO move_evals
-                   (game_id, ply, move_uci, move_san, eval_cp, eval_mate,
-                    depth, pv, nodes, nps, time_ms, source, clock_ms)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    game.id, ply, move.uci(), move_san, eval_cp, eval_mate,
-                    depth, pv_str, nodes, nps, time_ms, source, clock_ms,
-                ),
-            )
-            self._conn.commit()
+            self._put(_SQL_INSERT_MOVE, (
+                game.id, ply, move.uci(), move_san, eval_cp, eval_mate,
+                depth, pv_str, nodes, nps, time_ms, source, clock_ms,
+            ))
+            self._maybe_optimize()
         except Exception:
-            logger.exception(f"Failed to log move for {game.id}")
+            logger.exception("Failed to log move for %s", game.id)
 
     def update_live_state(self, game: Any, board: chess.Board) -> None:
-        """Update the live board state (called after every move, including opponent's)."""
+        """Queue an update of the live board state (called after every move, including opponent's)."""
         try:
-            moves_uci = " ".join(m.uci() for m in board.move_stack)
-            last_move = board.move_stack[-1].uci() if board.move_stack else None
+            fen = _live_fen(board)
             state = game.state
+            wtime = state.get("wtime")
+            btime = state.get("btime")
+            # Lichess sometimes repeats a gameState, which would rewrite an identical row
+            live = (fen, wtime, btime)
+            if self._last_live.get(game.id) == live:
+                return
 
-            self._conn.execute(
-                """UPDATE live_state
-                   SET fen = ?, last_move_uci = ?, moves_uci = ?,
-                       wtime_ms = ?, btime_ms = ?
-                   WHERE game_id = ?""",
-                (
-                    board.fen(),
-                    last_move,
-                    moves_uci,
-                    state.get("wtime"),
-                    state.get("btime"),
-                    game.id,
-                ),
-            )
-            self._conn.commit()
+            if state.get("wtakeback") or state.get("btakeback"):
+                # A takeback is under way, so the cached moves may not be a prefix of the board's moves
+                self._moves.pop(game.id, None)
+            moves_bin = self._encoded_moves(game.id, board)
+            last_move = board.move_stack[-1].uci() if board.move_stack else None
+            self._put(_SQL_UPDATE_LIVE, (fen, last_move, moves_bin, wtime, btime, game.id))
+            self._last_live[game.id] = live
         except Exception:
-            logger.exception(f"Failed to update live state for {game.id}")
+            logger.exception("Failed to update live state for %s", game.id)
+
+    def _encoded_moves(self, game_id: str, board: chess.Board) -> bytes:
+        """
+        Get the moves of `board` as packed `encode_move` codes.
+
+        The codes are cached per game so that the usual one-move update only encodes the newest move. Anything else
+        (a takeback, a resumed game, a missed update) rebuilds them from the whole move stack. The cache is checked
+        against the ply count and the last cached move only, so earlier moves that changed without an update in
+        between go unnoticed; `update_live_state` drops the cache while a takeback is offered for that reason.
+        """
+        stack = board.move_stack
+        ply = len(stack)
+        cached_ply, moves_bin = self._moves.get(game_id, (0, bytearray()))
+        cached_last = bytes(moves_bin[-2:])
+        if ply == cached_ply + 1 and cached_last == (encode_move(stack[-2]) if ply > 1 else b""):
+            moves_bin += encode_move(stack[-1])
+        elif ply != cached_ply or (stack and cached_last != encode_move(stack[-1])):
+            moves_bin = bytearray(b"".join(map(encode_move, stack)))
+        self._moves[game_id] = (ply, moves_bin)
+        return bytes(moves_bin)
 
     def game_finished(self, game: Any) -> None:
         """Mark a game as finished and clean up live state."""
+        if self._closed:
+            logger.debug("GameLogger is closed, not logging game end for %s", game.id)
+            return
         try:
+            # The live_state row must have its final moves before it is read and deleted
+            self.flush()
+            self._moves.pop(game.id, None)
+            self._last_live.pop(game.id, None)
             winner = game.state.get("winner")
             termination = game.state.get("status")
             result = game.result()
 
-            # Grab moves_uci from live_state before deleting it
-            row = self._conn.execute(
-                "SELECT moves_uci FROM live_state WHERE game_id = ?", (game.id,)
-            ).fetchone()
-            moves_uci = row[0] if row else None
-
-            self._conn.execute(
-                """UPDATE games
-                   SET status = 'finished', result = ?, termination = ?,
-                       finished_at = ?, moves_uci = ?
-                   WHERE game_id = ?""",
-                (
-                    result,
-                    termination,
-                    datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                    moves_uci,
-                    game.id,
-                ),
-            )
-            self._conn.execute("DELETE FROM live_state WHERE game_id = ?", (game.id,))
-            self._conn.commit()
-            logger.info(f"Game finished: {game.id} result={result} term={termination}")
+            with self._lock:
+                with self._conn:
+                    # Grab moves_bin from live_state while deleting it
+                    if _HAS_RETURNING:
+                        row = self._conn.execute(_SQL_DELETE_LIVE_RETURNING, (game.id,)).fetchone()
+                    else:
+                        row = self._conn.execute(_SQL_SELECT_LIVE_MOVES, (game.id,)).fetchone()
+                        self._conn.execute(_SQL_DELETE_LIVE, (game.id,))
+                    moves_bin = row[0] if row else None
+                    moves_uci = None if moves_bin is None else " ".join(map(chess.Move.uci, decode_moves_bin(moves_bin)))
+
+                    self._conn.execute(
+                        _SQL_UPDATE_FINISHED,
+                        (
+                            result,
+                            termination,
+                            datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                            moves_uci,
+                            game.id,
+                        ),
+                    )
+                # A finished game is a lull in writes, so keep the WAL short for readers without blocking anyone
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            logger.info("Game finished: %s result=%s term=%s", game.id, result, termination)
         except Exception:
-            logger.exception(f"Failed to log game end for {game.id}")
+            logger.exception("Failed to log game end for %s", game.id)
+
+    def _archive_chunk(self) -> bool:
+        """
+        Move the evals of up to `ARCHIVE_CHUNK_GAMES` games finished before this month to their monthly archive.
+
+        Return whether there may be more evals to archive. Run by the writer thread when it is idle.
+
+        A transaction spanning the main database and an attached one is not atomic across the two files in WAL mode,
+        so the evals are copied and committed to the archive first and deleted from the main database in a second
+        transaction. A crash in between leaves the evals in both databases, and the next pass deletes them again.
+        """
+        current_month = f"{datetime.datetime.now(datetime.timezone.utc):%Y-%m}"
+        try:
+            with self._lock:
+                (month,) = self._conn.execute(_SQL_ARCHIVE_MONTH, (current_month,)).fetchone()
+                if month is None:
+                    return False
+                archive = self.db_path.parent / ARCHIVE_NAME.format(month=month.replace("-", ""))
+                self._conn.execute("ATTACH DATABASE ? AS archive", (str(archive),))
+                try:
+                    self._conn.executescript(ARCHIVE_SCHEMA)
+                    game_ids = self._conn.execute(_SQL_MONTH_GAMES, (month, ARCHIVE_CHUNK_GAMES)).fetchall()
+                    with self._conn:
+                        self._conn.executemany(_SQL_ARCHIVE_MOVES, game_ids)
+                    with self._conn:
+                        moved = self._conn.executemany(
+                            _SQL_DELETE_ARCHIVED_MOVES, [(game_id, game_id) for (game_id,) in game_ids]
+                        ).rowcount
+                finally:
+                    self._conn.execute("DETACH DATABASE archive")
+        except Exception:
+            logger.exception("Failed to archive move evals before %s", current_month)
+            return False
+        logger.debug("Archived %s move evals of %s to %s", moved, month, archive)
+        return True
 
 
 # Module-level singleton
@@ -259,8 +681,15 @@ _logger: GameLogger | None = None
 
 
 def get_game_logger() -> GameLogger:
-    """Get or create the singleton GameLogger instance."""
+    """Get or create the singleton GameLogger instance. A closed instance is replaced by a new one."""
     global _logger
-    if _logger is None:
+    if _logger is None or _logger.closed:
         _logger = GameLogger()
     return _logger
+
+
+@atexit.register
+def _close_game_logger() -> None:
+    """Write the statements still queued by the singleton GameLogger when the interpreter exits."""
+    if _logger is not None:
+        _logger.close()
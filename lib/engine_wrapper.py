@@ -139,7 +139,7 @@ class EngineWrapper:
                   is_correspondence: bool,
                   correspondence_move_time: datetime.timedelta,
                   engine_cfg: Configuration,
-                  min_time: datetime.timedelta) -> None:
+                  min_time: datetime.timedelta) -> chess.Move | None:
         """
         Play a move.
 
@@ -153,7 +153,7 @@ class EngineWrapper:
         :param correspondence_move_time: The time the engine will think if `is_correspondence` is true.
         :param engine_cfg: Options for external moves (e.g. from an opening book), and for engine resignation and draw offers.
         :param min_time: Minimum time to spend, in seconds.
-        :return: The move to play.
+        :return: The move sent to lichess.org, or None if the bot resigned or ended the game.
         """
         polyglot_cfg = engine_cfg.polyglot
         online_moves_cfg = engine_cfg.online_moves
@@ -193,7 +193,7 @@ class EngineWrapper:
                 logger.error(error)
                 game_ender = li.abort if game.is_abortable() else li.resign
                 game_ender(game.id)
-                return
+                return None
 
         # Heed min_time
         elapsed = setup_timer.time_since_reset()
@@ -204,8 +204,9 @@ class EngineWrapper:
         self.print_stats()
         if best_move.resigned and len(board.move_stack) >= 2:
             li.resign(game.id)
-        else:
-            li.make_move(game.id, best_move)
+            return None
+        li.make_move(game.id, best_move)
+        return best_move.move
 
     def add_go_commands(self, time_limit: chess.engine.Limit) -> chess.engine.Limit:
         """Add extra commands to send to the engine. For example, to search for 1000 nodes or up to depth 10."""
@@ -743,22 +743,21 @@ def play_game(li: lichess.Lichess,
                         setup_timer = Timer()
                         print_move_number(board)
                         move_attempted = True
-                        engine.play_move(board,
-                                         game,
-                                         li,
-                                         setup_timer,
-                                         move_overhead,
-                                         can_ponder,
-                                         is_correspondence,
-                                         correspondence_move_time,
-                                         engine_cfg,
-                                         fake_think_time(config, board, game))
-                        # Log engine move + eval to SQLite
-                        if board.move_stack:
-                            last_move = board.move_stack[-1]
+                        played_move = engine.play_move(board,
+                                                       game,
+                                                       li,
+                                                       setup_timer,
+                                                       move_overhead,
+                                                       can_ponder,
+                                                       is_correspondence,
+                                                       correspondence_move_time,
+                                                       engine_cfg,
+                                                       fake_think_time(config, board, game))
+                        # Log engine move + eval to SQLite. The board is still the position before the move.
+                        if played_move is not None:
                             commentary = engine.move_commentary[-1] if engine.move_commentary else None
                             source = "book" if commentary and commentary.get("string", "").startswith("lichess-bot-source:") else "search"
-                            game_logger.move_played(game, board, last_move, commentary, source)
+                            game_logger.move_played(game, board, played_move, commentary, source)
                         time.sleep(to_seconds(delay))
                     elif is_game_over(game):
                         tell_user_game_result(game, board)
@@ -802,6 +801,8 @@ def play_game(li: lichess.Lichess,
 
         pgn_record = try_get_pgn_game_record(li, config, game, board, engine)
     game_logger.game_finished(game)
+    # Pool workers are terminated without running exit handlers, so write everything out before the next game
+    game_logger.close()
     final_queue_entries(control_queue, correspondence_queue, game, is_correspondence, pgn_record, pgn_queue)
     delete_takeback_record(game)
 
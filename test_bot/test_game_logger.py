@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 import datetime
+import functools
+import logging
+import shutil
 import sqlite3
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
@@ -14,7 +18,8 @@ import pytest
 
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from game_logger import GameLogger
+import game_logger
+from game_logger import GameLogger, SCHEMA_VERSION, decode_moves_bin, encode_move
 
 
 # ---------------------------------------------------------------------------
@@ -65,9 +70,19 @@ class MockGame:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="session")
+def template_db(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Build an empty database with the current schema once, for each test to copy."""
+    path = tmp_path_factory.mktemp("template") / "games.db"
+    GameLogger(db_path=path).close()
+    return path
+
+
 @pytest.fixture
-def db_path(tmp_path: Path) -> Path:
-    return tmp_path / "test_games.db"
+def db_path(tmp_path: Path, template_db: Path) -> Path:
+    path = tmp_path / "test_games.db"
+    shutil.copyfile(template_db, path)
+    return path
 
 
 @pytest.fixture
@@ -112,6 +127,12 @@ def make_commentary(
     }
 
 
+def live_moves(conn: sqlite3.Connection, game_id: str) -> str:
+    """Decode the live_state moves of a game to space-separated UCI."""
+    (moves_bin,) = conn.execute("SELECT moves_bin FROM live_state WHERE game_id = ?", (game_id,)).fetchone()
+    return " ".join(move.uci() for move in decode_moves_bin(moves_bin))
+
+
 # ---------------------------------------------------------------------------
 # Tests
 # ---------------------------------------------------------------------------
@@ -131,14 +152,151 @@ class TestSchemaCreation:
         mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
         assert mode == "wal"
 
+    def test_connection_pragmas(self, logger: GameLogger) -> None:
+        assert logger._conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert logger._conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert logger._conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert logger._conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 2000
+
     def test_indices_exist(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
         indices = {
             row["name"]
             for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall()
         }
-        assert "idx_move_evals_game" in indices
         assert "idx_games_status" in indices
         assert "idx_games_started" in indices
+        assert "idx_move_evals_covering" in indices
+        assert "idx_move_evals_game" not in indices
+
+    def test_live_state_without_rowid(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'live_state'").fetchone()
+        assert "WITHOUT ROWID" in row["sql"]
+
+    def test_move_evals_lookup_uses_covering_index(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        plan = conn.execute(
+            """EXPLAIN QUERY PLAN
+               SELECT ply, move_uci, move_san, eval_cp, eval_mate, depth
+               FROM move_evals WHERE game_id = ? ORDER BY ply""",
+            ("game",),
+        ).fetchall()
+        assert any("COVERING INDEX idx_move_evals_covering" in row["detail"] for row in plan)
+
+
+class TestMigration:
+    def test_new_database_is_current(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+    def test_adds_moves_uci_to_old_database(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "old_games.db"
+        old = sqlite3.connect(str(db_path))
+        old.executescript(game_logger.SCHEMA.replace("finished_at TEXT,\n    moves_uci TEXT", "finished_at TEXT"))
+        old.execute("INSERT INTO games (game_id) VALUES ('old_game')")
+        assert "moves_uci" not in {row[1] for row in old.execute("PRAGMA table_info(games)")}
+        old.commit()
+        old.close()
+
+        GameLogger(db_path=db_path).close()
+
+        upgraded = sqlite3.connect(str(db_path))
+        columns = {row[1] for row in upgraded.execute("PRAGMA table_info(games)")}
+        assert "moves_uci" in columns
+        assert upgraded.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert upgraded.execute("SELECT game_id FROM games").fetchone()[0] == "old_game"
+        upgraded.close()
+
+    def test_rebuilds_old_live_state(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "old_games.db"
+        old = sqlite3.connect(str(db_path))
+        old.executescript(
+            game_logger.SCHEMA.replace(",\n    moves_bin BLOB\n) WITHOUT ROWID;", ",\n    moves_uci TEXT\n);")
+        )
+        old.execute("CREATE INDEX idx_move_evals_game ON move_evals(game_id, ply)")
+        old.execute("INSERT INTO games (game_id, status) VALUES ('old_game', 'playing')")
+        old.execute("INSERT INTO live_state (game_id, fen, moves_uci) VALUES ('old_game', ?, 'e2e4 e7e5')",
+                    (chess.STARTING_FEN,))
+        old.commit()
+        old.close()
+
+        gl = GameLogger(db_path=db_path)
+        upgraded = sqlite3.connect(str(db_path))
+        (live_state_sql,) = upgraded.execute("SELECT sql FROM sqlite_master WHERE name = 'live_state'").fetchone()
+        assert "WITHOUT ROWID" in live_state_sql
+        assert "moves_uci" not in {row[1] for row in upgraded.execute("PRAGMA table_info(live_state)")}
+        assert upgraded.execute("SELECT game_id, fen FROM live_state").fetchall() == [("old_game", chess.STARTING_FEN)]
+        assert live_moves(upgraded, "old_game") == "e2e4 e7e5"
+        assert upgraded.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_move_evals_game'").fetchone() is None
+
+        # The game in progress during the upgrade keeps its moves when it finishes
+        gl.game_finished(MockGame(id="old_game"))
+        gl.close()
+        assert upgraded.execute("SELECT moves_uci FROM games").fetchone()[0] == "e2e4 e7e5"
+        upgraded.close()
+
+    def test_replaces_moves_uci_with_moves_bin(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "old_games.db"
+        old = sqlite3.connect(str(db_path))
+        old.executescript(game_logger.SCHEMA.replace(",\n    moves_bin BLOB\n)", ",\n    moves_uci TEXT\n)"))
+        old.execute("INSERT INTO live_state (game_id, moves_uci) VALUES ('old_game', 'e2e4'), ('new_game', '')")
+        old.execute("PRAGMA user_version = 2")
+        old.commit()
+        old.close()
+
+        GameLogger(db_path=db_path).close()
+
+        upgraded = sqlite3.connect(str(db_path))
+        columns = {row[1] for row in upgraded.execute("PRAGMA table_info(live_state)")}
+        assert "moves_bin" in columns
+        assert "moves_uci" not in columns
+        assert live_moves(upgraded, "old_game") == "e2e4"
+        assert live_moves(upgraded, "new_game") == ""
+        upgraded.close()
+
+    def test_current_database_skips_schema_setup(self, db_path: Path) -> None:
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("DROP INDEX idx_games_status")
+        conn.commit()
+        conn.close()
+
+        GameLogger(db_path=db_path).close()
+
+        conn = sqlite3.connect(str(db_path))
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_games_status'").fetchone() is None
+        conn.close()
+
+
+class TestMoveEncoding:
+    def test_round_trip(self) -> None:
+        moves = [chess.Move.from_uci(uci) for uci in ["e2e4", "e7e8q", "h8a1", "a2a1n"]]
+        buf = b"".join(map(encode_move, moves))
+        assert len(buf) == 2 * len(moves)
+        assert decode_moves_bin(buf) == moves
+
+    def test_drops_and_null_moves(self) -> None:
+        moves = [chess.Move.from_uci("N@f3"), chess.Move.from_uci("P@a2"), chess.Move.null()]
+        assert decode_moves_bin(b"".join(map(encode_move, moves))) == moves
+
+    def test_all_promotions(self) -> None:
+        pieces = (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+        moves = [chess.Move(chess.A7, chess.A8, promotion=piece) for piece in pieces]
+        assert decode_moves_bin(b"".join(map(encode_move, moves))) == moves
+
+
+class TestReaderConnection:
+    def test_reads_logged_games(self, logger: GameLogger, db_path: Path) -> None:
+        game = MockGame()
+        logger.game_started(game, "matchmaking")
+
+        reader = GameLogger.reader_connection(db_path)
+        row = reader.execute("SELECT game_id FROM games").fetchone()
+        assert row[0] == game.id
+
+    def test_reuses_connection(self, logger: GameLogger, db_path: Path) -> None:
+        assert GameLogger.reader_connection(db_path) is GameLogger.reader_connection(db_path)
+
+    def test_is_read_only(self, logger: GameLogger, db_path: Path) -> None:
+        reader = GameLogger.reader_connection(db_path)
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("DELETE FROM games")
 
 
 class TestGameStarted:
@@ -169,7 +327,7 @@ class TestGameStarted:
         assert row is not None
         assert row["fen"] == chess.STARTING_FEN
         assert row["last_move_uci"] is None
-        assert row["moves_uci"] == ""
+        assert row["moves_bin"] == b""
         assert row["wtime_ms"] == 180000
         assert row["btime_ms"] == 180000
 
@@ -188,11 +346,12 @@ class TestMovePlayed:
 
         board = chess.Board()
         move = chess.Move.from_uci("e2e4")
-        board.push(move)
         commentary = make_commentary(cp=35, depth=12, nodes=50000, nps=1000000, time_sec=0.05)
 
         logger.move_played(game, board, move, commentary, source="search")
 
+        logger.flush()
+
         row = conn.execute("SELECT * FROM move_evals WHERE game_id = ?", (game.id,)).fetchone()
         assert row is not None
         assert row["ply"] == 0
@@ -213,10 +372,11 @@ class TestMovePlayed:
 
         board = chess.Board()
         move = chess.Move.from_uci("e2e4")
-        board.push(move)
 
         logger.move_played(game, board, move, None, source="book")
 
+        logger.flush()
+
         row = conn.execute("SELECT * FROM move_evals WHERE game_id = ?", (game.id,)).fetchone()
         assert row is not None
         assert row["eval_cp"] is None
@@ -230,11 +390,12 @@ class TestMovePlayed:
 
         board = chess.Board()
         move = chess.Move.from_uci("e2e4")
-        board.push(move)
         commentary = make_commentary(mate=3)
 
         logger.move_played(game, board, move, commentary, source="search")
 
+        logger.flush()
+
         row = conn.execute("SELECT * FROM move_evals WHERE game_id = ?", (game.id,)).fetchone()
         assert row["eval_mate"] == 3
         assert row["eval_cp"] is None
@@ -245,11 +406,12 @@ class TestMovePlayed:
 
         board = chess.Board()
         move = chess.Move.from_uci("e2e4")
-        board.push(move)
         commentary = make_commentary(mate=-5)
 
         logger.move_played(game, board, move, commentary, source="search")
 
+        logger.flush()
+
         row = conn.execute("SELECT * FROM move_evals WHERE game_id = ?", (game.id,)).fetchone()
         assert row["eval_mate"] == -5
 
@@ -260,10 +422,11 @@ class TestMovePlayed:
 
         board = chess.Board()
         move = chess.Move.from_uci("e2e4")
-        board.push(move)
 
         logger.move_played(game, board, move, make_commentary(), source="search")
 
+        logger.flush()
+
         row = conn.execute("SELECT clock_ms FROM move_evals WHERE game_id = ?", (game.id,)).fetchone()
         assert row["clock_ms"] == 175000
 
@@ -275,13 +438,65 @@ class TestMovePlayed:
         board = chess.Board()
         board.push(chess.Move.from_uci("e2e4"))  # white's move
         move = chess.Move.from_uci("e7e5")
-        board.push(move)
 
         logger.move_played(game, board, move, make_commentary(), source="search")
 
-        row = conn.execute("SELECT clock_ms FROM move_evals WHERE game_id = ?", (game.id,)).fetchone()
+        logger.flush()
+
+        row = conn.execute("SELECT ply, move_san, clock_ms FROM move_evals WHERE game_id = ?", (game.id,)).fetchone()
+        assert row["ply"] == 1
+        assert row["move_san"] == "e5"
         assert row["clock_ms"] == 170000
 
+    def test_close_writes_queued_moves(self, db_path: Path) -> None:
+        gl = GameLogger(db_path=db_path)
+        game = MockGame()
+        gl.game_started(game, "matchmaking")
+
+        board = chess.Board()
+        for uci in ["e2e4", "e7e5", "g1f3"]:
+            move = chess.Move.from_uci(uci)
+            gl.move_played(game, board, move, make_commentary(), source="search")
+            board.push(move)
+        gl.close()
+
+        c = sqlite3.connect(str(db_path))
+        assert c.execute("SELECT COUNT(*) FROM move_evals").fetchone()[0] == 3
+        c.close()
+
+    def test_writes_after_close_are_dropped(self, logger: GameLogger, conn: sqlite3.Connection,
+                                            caplog: pytest.LogCaptureFixture) -> None:
+        game = MockGame()
+        logger.game_started(game, "matchmaking")
+        logger.close()
+
+        logger.game_started(MockGame(id="late_game"), "matchmaking")
+        # The move below would run PRAGMA optimize on an open logger
+        logger._moves_since_optimize = game_logger.OPTIMIZE_INTERVAL - 1
+        board = chess.Board()
+        move = chess.Move.from_uci("e2e4")
+        logger.move_played(game, board, move, make_commentary(), source="search")
+        board.push(move)
+        logger.update_live_state(game, board)
+        # Returns instead of waiting on statements no writer thread will ever take
+        logger.flush()
+        logger.game_finished(game)
+
+        assert conn.execute("SELECT COUNT(*) FROM move_evals").fetchone()[0] == 0
+        assert [tuple(row) for row in conn.execute("SELECT game_id, status FROM games")] == [(game.id, "playing")]
+        assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+    def test_get_game_logger_replaces_closed_logger(self, db_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(game_logger, "GameLogger", functools.partial(GameLogger, db_path=db_path))
+        monkeypatch.setattr(game_logger, "_logger", None)
+        first = game_logger.get_game_logger()
+        assert game_logger.get_game_logger() is first
+        first.close()
+        second = game_logger.get_game_logger()
+        assert second is not first
+        assert not second.closed
+        second.close()
+
 
 class TestUpdateLiveState:
     def test_updates_fen_and_moves(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
@@ -296,10 +511,12 @@ class TestUpdateLiveState:
 
         logger.update_live_state(game, board)
 
+        logger.flush()
+
         row = conn.execute("SELECT * FROM live_state WHERE game_id = ?", (game.id,)).fetchone()
         assert row["fen"] == board.fen()
         assert row["last_move_uci"] == "e7e5"
-        assert row["moves_uci"] == "e2e4 e7e5"
+        assert decode_moves_bin(row["moves_bin"]) == board.move_stack
         assert row["wtime_ms"] == 175000
         assert row["btime_ms"] == 178000
 
@@ -312,9 +529,106 @@ class TestUpdateLiveState:
 
         logger.update_live_state(game, board)
 
+        logger.flush()
+
         row = conn.execute("SELECT * FROM live_state WHERE game_id = ?", (game.id,)).fetchone()
         assert row["last_move_uci"] == "d2d4"
-        assert row["moves_uci"] == "d2d4"
+        assert live_moves(conn, game.id) == "d2d4"
+
+    def test_skips_repeated_state(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        game = MockGame()
+        logger.game_started(game, "matchmaking")
+
+        board = chess.Board()
+        board.push_uci("e2e4")
+        logger.update_live_state(game, board)
+        logger.flush()
+
+        # Overwrite the row behind the logger's back; a repeated state must not rewrite it
+        conn.execute("UPDATE live_state SET fen = 'sentinel'")
+        conn.commit()
+        logger.update_live_state(game, board)
+        logger.flush()
+        assert conn.execute("SELECT fen FROM live_state").fetchone()[0] == "sentinel"
+
+        # A clock change is written even though the position is the same
+        game.state["wtime"] = 170000
+        logger.update_live_state(game, board)
+        logger.flush()
+        row = conn.execute("SELECT fen, wtime_ms FROM live_state").fetchone()
+        assert row["fen"] == board.fen()
+        assert row["wtime_ms"] == 170000
+
+    def test_fen_without_castling_rights(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        game = MockGame()
+        logger.game_started(game, "matchmaking")
+
+        board = chess.Board("8/5k2/8/3K4/8/8/4P3/8 w - - 3 40")
+        board.push_uci("e2e3")
+        logger.update_live_state(game, board)
+        board.push_uci("f7e7")
+        board.push_uci("e3e4")
+        logger.update_live_state(game, board)
+        logger.flush()
+
+        row = conn.execute("SELECT fen FROM live_state WHERE game_id = ?", (game.id,)).fetchone()
+        assert row["fen"] == board.fen() == "8/4k3/8/3K4/4P3/8/8/8 b - - 0 41"
+
+    def test_incremental_moves(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        game = MockGame()
+        logger.game_started(game, "matchmaking")
+
+        board = chess.Board()
+        for uci in ["e2e4", "e7e5", "g1f3"]:
+            board.push_uci(uci)
+            logger.update_live_state(game, board)
+        logger.flush()
+
+        assert live_moves(conn, game.id) == "e2e4 e7e5 g1f3"
+
+    def test_takeback_rebuilds_moves(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        game = MockGame()
+        logger.game_started(game, "matchmaking")
+
+        board = chess.Board()
+        for uci in ["e2e4", "e7e5", "g1f3"]:
+            board.push_uci(uci)
+            logger.update_live_state(game, board)
+
+        # Take back two moves and play different ones without reporting the intermediate position.
+        board.pop()
+        board.pop()
+        board.push_uci("c7c5")
+        board.push_uci("b1c3")
+        logger.update_live_state(game, board)
+        logger.flush()
+
+        assert live_moves(conn, game.id) == "e2e4 c7c5 b1c3"
+
+        board.pop()
+        logger.update_live_state(game, board)
+        logger.flush()
+
+        assert live_moves(conn, game.id) == "e2e4 c7c5"
+
+    def test_takeback_offer_rebuilds_moves(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        game = MockGame()
+        logger.game_started(game, "matchmaking")
+
+        board = chess.Board()
+        for uci in ["e2e4", "e7e5", "g1f3"]:
+            board.push_uci(uci)
+            logger.update_live_state(game, board)
+
+        # Same ply count and last move as the cached moves, but a different second move
+        game.state["btakeback"] = True
+        board = chess.Board()
+        for uci in ["e2e4", "c7c5", "g1f3"]:
+            board.push_uci(uci)
+        logger.update_live_state(game, board)
+        logger.flush()
+
+        assert live_moves(conn, game.id) == "e2e4 c7c5 g1f3"
 
 
 class TestGameFinished:
@@ -352,6 +666,137 @@ class TestGameFinished:
         assert row["result"] == "0-1"
         assert row["termination"] == "resign"
 
+    @pytest.mark.parametrize("has_returning", [True, False])
+    def test_copies_moves_to_games(self, logger: GameLogger, conn: sqlite3.Connection,
+                                   monkeypatch: pytest.MonkeyPatch, has_returning: bool) -> None:
+        monkeypatch.setattr(game_logger, "_HAS_RETURNING", has_returning)
+        game = MockGame()
+        logger.game_started(game, "matchmaking")
+
+        board = chess.Board()
+        board.push_uci("e2e4")
+        logger.update_live_state(game, board)
+        logger.game_finished(game)
+
+        row = conn.execute("SELECT moves_uci FROM games WHERE game_id = ?", (game.id,)).fetchone()
+        assert row["moves_uci"] == "e2e4"
+        assert conn.execute("SELECT COUNT(*) FROM live_state").fetchone()[0] == 0
+
+
+class TestArchive:
+    @pytest.fixture(autouse=True)
+    def no_idle_archiving(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Keep the writer thread from archiving behind the tests' back once it has written their moves
+        monkeypatch.setattr(game_logger, "ARCHIVE_IDLE_WAIT", 3600)
+
+    @staticmethod
+    def play_old_game(logger: GameLogger, conn: sqlite3.Connection, game_id: str, finished_at: str) -> None:
+        game = MockGame(id=game_id)
+        logger.game_started(game, "matchmaking")
+        board = chess.Board()
+        for uci in ["e2e4", "e7e5"]:
+            move = chess.Move.from_uci(uci)
+            logger.move_played(game, board, move, make_commentary(), source="search")
+            board.push(move)
+        logger.flush()
+        with conn:
+            conn.execute("UPDATE games SET status = 'finished', finished_at = ? WHERE game_id = ?", (finished_at, game_id))
+
+    @staticmethod
+    def archive_all(logger: GameLogger) -> None:
+        while logger._archive_chunk():
+            pass
+
+    def test_moves_old_evals_to_monthly_archive(self, logger: GameLogger, conn: sqlite3.Connection,
+                                                db_path: Path) -> None:
+        self.play_old_game(logger, conn, "january", "2025-01-20T10:00:00+00:00")
+        self.play_old_game(logger, conn, "february", "2025-02-03T10:00:00+00:00")
+
+        current = MockGame(id="current")
+        logger.game_started(current, "matchmaking")
+        board = chess.Board()
+        move = chess.Move.from_uci("d2d4")
+        logger.move_played(current, board, move, make_commentary(), source="search")
+        logger.game_finished(current)
+        self.archive_all(logger)
+
+        remaining = {row[0] for row in conn.execute("SELECT DISTINCT game_id FROM move_evals")}
+        assert remaining == {"current"}
+
+        for month, game_id in [("202501", "january"), ("202502", "february")]:
+            archive = sqlite3.connect(str(db_path.parent / f"move_evals_{month}.db"))
+            rows = archive.execute("SELECT game_id, ply, move_san FROM move_evals ORDER BY ply").fetchall()
+            assert rows == [(game_id, 0, "e4"), (game_id, 1, "e5")]
+            archive.close()
+
+    def test_archives_in_chunks(self, logger: GameLogger, conn: sqlite3.Connection,
+                                monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(game_logger, "ARCHIVE_CHUNK_GAMES", 1)
+        self.play_old_game(logger, conn, "january_1", "2025-01-20T10:00:00+00:00")
+        self.play_old_game(logger, conn, "january_2", "2025-01-21T10:00:00+00:00")
+
+        assert logger._archive_chunk()
+        remaining = {row[0] for row in conn.execute("SELECT DISTINCT game_id FROM move_evals")}
+        assert remaining == {"january_2"}
+        assert logger._archive_chunk()
+        assert not logger._archive_chunk()
+        assert conn.execute("SELECT COUNT(*) FROM move_evals").fetchone()[0] == 0
+
+    def test_repairs_evals_left_in_both_databases(self, logger: GameLogger, conn: sqlite3.Connection,
+                                                  db_path: Path) -> None:
+        self.play_old_game(logger, conn, "january", "2025-01-20T10:00:00+00:00")
+        self.archive_all(logger)
+
+        # A crash after the archive commit but before the delete leaves the evals in both databases
+        archive_path = db_path.parent / "move_evals_202501.db"
+        with conn:
+            conn.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+            conn.execute("INSERT INTO main.move_evals SELECT * FROM archive.move_evals")
+        conn.execute("DETACH DATABASE archive")
+        self.archive_all(logger)
+
+        assert conn.execute("SELECT COUNT(*) FROM move_evals").fetchone()[0] == 0
+        archive = sqlite3.connect(str(archive_path))
+        assert archive.execute("SELECT COUNT(*) FROM move_evals").fetchone()[0] == 2
+        archive.close()
+
+    def test_writer_archives_when_idle(self, logger: GameLogger, conn: sqlite3.Connection,
+                                       monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(game_logger, "ARCHIVE_IDLE_WAIT", 0.01)
+        self.play_old_game(logger, conn, "january", "2025-01-20T10:00:00+00:00")
+
+        # The writer may still be in the wait it started with the default ARCHIVE_IDLE_WAIT
+        deadline = time.monotonic() + 5
+        while conn.execute("SELECT COUNT(*) FROM move_evals").fetchone()[0] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert conn.execute("SELECT COUNT(*) FROM move_evals").fetchone()[0] == 0
+
+    def test_reader_view_includes_archives(self, logger: GameLogger, conn: sqlite3.Connection,
+                                           db_path: Path) -> None:
+        self.play_old_game(logger, conn, "january", "2025-01-20T10:00:00+00:00")
+        current = MockGame(id="current")
+        logger.game_started(current, "matchmaking")
+        logger.move_played(current, chess.Board(), chess.Move.from_uci("d2d4"), make_commentary(), source="search")
+        logger.game_finished(current)
+        self.archive_all(logger)
+
+        reader = GameLogger.reader_connection(db_path)
+        rows = reader.execute("SELECT game_id, COUNT(*) FROM move_evals_all GROUP BY game_id ORDER BY game_id").fetchall()
+        assert rows == [("current", 1), ("january", 2)]
+
+    def test_reader_opened_before_archiving_sees_archived_evals(self, logger: GameLogger, conn: sqlite3.Connection,
+                                                                db_path: Path) -> None:
+        self.play_old_game(logger, conn, "january", "2025-01-20T10:00:00+00:00")
+        query = "SELECT game_id, COUNT(*) FROM move_evals_all GROUP BY game_id"
+        reader = GameLogger.reader_connection(db_path)
+        assert reader.execute(query).fetchall() == [("january", 2)]
+
+        self.archive_all(logger)
+
+        assert conn.execute("SELECT COUNT(*) FROM move_evals").fetchone()[0] == 0
+        assert GameLogger.reader_connection(db_path) is reader
+        assert reader.execute(query).fetchall() == [("january", 2)]
+
 
 class TestFullLifecycle:
     def test_complete_game(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
@@ -367,8 +812,8 @@ class TestFullLifecycle:
 
         # Move 1: e4
         move1 = chess.Move.from_uci("e2e4")
-        board.push(move1)
         logger.move_played(game, board, move1, make_commentary(cp=30), source="book")
+        board.push(move1)
         logger.update_live_state(game, board)
 
         # Opponent plays e5
@@ -379,11 +824,12 @@ class TestFullLifecycle:
 
         # Move 2: Nf3
         move2 = chess.Move.from_uci("g1f3")
-        board.push(move2)
         logger.move_played(game, board, move2, make_commentary(cp=25, depth=14), source="search")
+        board.push(move2)
         logger.update_live_state(game, board)
 
         # Verify evals
+        logger.flush()
         evals = conn.execute(
             "SELECT * FROM move_evals WHERE game_id = ? ORDER BY ply", (game.id,)
         ).fetchall()
@@ -392,8 +838,7 @@ class TestFullLifecycle:
         assert evals[1]["move_san"] == "Nf3"
 
         # Verify live state is up to date
-        live = conn.execute("SELECT * FROM live_state WHERE game_id = ?", (game.id,)).fetchone()
-        assert "e2e4 e7e5 g1f3" == live["moves_uci"]
+        assert live_moves(conn, game.id) == "e2e4 e7e5 g1f3"
 
         # Finish the game
         game.state["winner"] = "white"
@@ -421,14 +866,25 @@ class TestErrorHandling:
         # but it should be caught internally
         logger.game_started(BadGame(), "test")  # type: ignore[arg-type]
 
+    def test_game_started_failure_rolls_back(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        # Make the live_state insert fail after the games insert has run
+        conn.execute("CREATE TRIGGER fail_live_state BEFORE INSERT ON live_state BEGIN SELECT RAISE(ABORT, 'fail'); END")
+        conn.commit()
+        logger.game_started(MockGame(), "test")
+        conn.execute("DROP TRIGGER fail_live_state")
+        conn.commit()
+
+        # A later commit must not pick up the half-written game
+        logger.game_started(MockGame(id="other_game"), "test")
+        assert [row["game_id"] for row in conn.execute("SELECT game_id FROM games")] == ["other_game"]
+
     def test_move_played_bad_board_does_not_raise(self, logger: GameLogger) -> None:
         game = MockGame()
         logger.game_started(game, "test")
 
-        # Pass a board with no moves (pop will fail)
+        # The move is illegal in the given position, so computing its SAN fails
         board = chess.Board()
-        move = chess.Move.from_uci("e2e4")
-        # Don't push the move — move_played will try to pop and fail
+        move = chess.Move.from_uci("e2e5")
         logger.move_played(game, board, move, None, source="search")
 
     def test_game_finished_nonexistent_does_not_raise(self, logger: GameLogger) -> None:
@@ -455,3 +911,22 @@ class TestMultipleGames:
         assert conn.execute("SELECT COUNT(*) FROM live_state").fetchone()[0] == 1
         live = conn.execute("SELECT game_id FROM live_state").fetchone()
         assert live["game_id"] == "game_2"
+
+    def test_interleaved_writes(self, logger: GameLogger, conn: sqlite3.Connection) -> None:
+        games = [MockGame(id="game_1"), MockGame(id="game_2"), MockGame(id="game_3")]
+        boards = [chess.Board() for _ in games]
+        for game in games:
+            logger.game_started(game, "matchmaking")
+
+        for uci in ["e2e4", "e7e5", "g1f3", "b8c6"]:
+            for game, board in zip(games, boards, strict=True):
+                move = chess.Move.from_uci(uci)
+                logger.move_played(game, board, move, make_commentary(), source="search")
+                board.push(move)
+                logger.update_live_state(game, board)
+        logger.flush()
+
+        for game in games:
+            assert live_moves(conn, game.id) == "e2e4 e7e5 g1f3 b8c6"
+            rows = conn.execute("SELECT ply FROM move_evals WHERE game_id = ? ORDER BY id", (game.id,))
+            assert [row["ply"] for row in rows] == [0, 1, 2, 3]